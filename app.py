@@ -7,6 +7,9 @@ import docx
 import io
 import json
 import re
+import threading
+import queue
+import time
 from datetime import datetime
 
 # Configure the page
@@ -17,9 +20,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# API key configured for the server in secrets or the environment
+def configured_api_key():
+    return st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+
 # Initialize Gemini API
 def initialize_gemini():
-    api_key = st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    api_key = configured_api_key()
     if not api_key:
         st.sidebar.error("Please set your Google API key in the sidebar")
         api_key = st.sidebar.text_input("Enter your Google API Key", type="password")
@@ -30,12 +37,12 @@ def initialize_gemini():
     return genai.GenerativeModel('gemini-2.0-flash')
 
 # Text extraction functions for different file types
-def extract_text_from_pdf(file):
+def extract_pages_from_pdf(file):
     pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+    return [page.extract_text() + "\n" for page in pdf_reader.pages]
+
+def extract_text_from_pdf(file):
+    return "".join(extract_pages_from_pdf(file))
 
 def extract_text_from_docx(file):
     doc = docx.Document(file)
@@ -47,29 +54,449 @@ def extract_text_from_docx(file):
 def extract_text_from_txt(file):
     return file.read().decode("utf-8")
 
-# Extract text from uploaded document
-def extract_text_from_file(uploaded_file):
+# Extract the pages of an uploaded document (DOCX and TXT files are a single page)
+def extract_pages_from_file(uploaded_file):
     if uploaded_file.name.endswith('.pdf'):
-        return extract_text_from_pdf(uploaded_file)
+        return extract_pages_from_pdf(uploaded_file)
     elif uploaded_file.name.endswith('.docx'):
-        return extract_text_from_docx(uploaded_file)
+        return [extract_text_from_docx(uploaded_file)]
     elif uploaded_file.name.endswith('.txt'):
-        return extract_text_from_txt(uploaded_file)
+        return [extract_text_from_txt(uploaded_file)]
     else:
         st.error("Unsupported file format. Please upload PDF, DOCX, or TXT files.")
         return None
 
+# Extract text from uploaded document
+def extract_text_from_file(uploaded_file):
+    pages = extract_pages_from_file(uploaded_file)
+    return "".join(pages) if pages is not None else None
+
+# Text compaction applied to extracted documents before they are sent to Gemini
+EDGE_LINES_PER_PAGE = 3
+MIN_BOILERPLATE_PAGES = 3
+MAX_BOILERPLATE_LINE_LENGTH = 120
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s*)?[-–]?\s*(\d+)\s*[-–]?(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+def boilerplate_signature(line):
+    # Mask numbers only in lines with words, so "Page 3 of 10" and dated court
+    # stamps match across pages but bare paragraph numbers never do
+    line = line.strip().lower()
+    if re.search(r"[a-z]", line):
+        return re.sub(r"\d+", "#", line)
+    return line
+
+def edge_line_indexes(lines):
+    non_blank = [i for i, line in enumerate(lines) if line.strip()]
+    return set(non_blank[:EDGE_LINES_PER_PAGE] + non_blank[-EDGE_LINES_PER_PAGE:])
+
+# Signatures of lines repeated at the top or bottom of more than half the pages
+def find_repeated_lines(pages):
+    page_counts = {}
+    for lines in pages:
+        for signature in {boilerplate_signature(lines[i]) for i in edge_line_indexes(lines)}:
+            page_counts[signature] = page_counts.get(signature, 0) + 1
+    return {signature for signature, count in page_counts.items()
+            if count > len(pages) / 2 and count >= MIN_BOILERPLATE_PAGES
+            and re.search(r"[a-z]", signature) and len(signature) <= MAX_BOILERPLATE_LINE_LENGTH}
+
+# A number at the top or bottom of a page is only a page number when it
+# follows the page sequence on more than half the pages
+def find_page_number_lines(pages):
+    candidates = {}
+    for index, lines in enumerate(pages):
+        for i in edge_line_indexes(lines):
+            match = PAGE_NUMBER_PATTERN.match(lines[i].strip())
+            if match:
+                offset = int(match.group(2)) - index
+                candidates.setdefault(offset, set()).add((index, i))
+    page_number_lines = set()
+    for positions in candidates.values():
+        numbered_pages = {index for index, _ in positions}
+        if len(numbered_pages) > len(pages) / 2 and len(numbered_pages) >= MIN_BOILERPLATE_PAGES:
+            page_number_lines |= positions
+    return page_number_lines
+
+# Re-join a word hyphenated across a line break. The hyphen is kept, since
+# compounds like "well-settled" or "non-bailable" cannot be told apart from
+# words split mid-word without a dictionary.
+def join_hyphenated(line, next_line):
+    if not re.search(r"\w-$", line) or not next_line[:1].isalpha():
+        return None
+    return line + next_line
+
+def compact_text(pages):
+    pages = [page.splitlines() for page in pages]
+    repeated = set()
+    page_number_lines = set()
+    if len(pages) >= MIN_BOILERPLATE_PAGES:
+        repeated = find_repeated_lines(pages)
+        page_number_lines = find_page_number_lines(pages)
+
+    kept = []
+    for index, lines in enumerate(pages):
+        edges = edge_line_indexes(lines)
+        page_lines = []
+        for i, line in enumerate(lines):
+            if (index, i) in page_number_lines or (i in edges and boilerplate_signature(line) in repeated):
+                continue
+            page_lines.append(" ".join(line.split()))
+        while page_lines and not page_lines[0]:
+            page_lines.pop(0)
+        while page_lines and not page_lines[-1]:
+            page_lines.pop()
+
+        # Pages continue on the next line, so a word split across a page
+        # break is re-joined like any other line break
+        for line in page_lines:
+            joined = join_hyphenated(kept[-1], line) if kept and kept[-1] and line else None
+            if joined is not None:
+                kept[-1] = joined
+            else:
+                kept.append(line)
+
+    text = "\n".join(kept)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+# Rough token estimate (about four characters per token for English text)
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+def compact_document_text(pages):
+    text = "".join(pages)
+    compacted = compact_text(pages)
+    original_tokens = estimate_tokens(text)
+    saved_tokens = original_tokens - estimate_tokens(compacted)
+    saved_percent = 100 * saved_tokens / original_tokens if original_tokens else 0
+    st.caption(f"Text compaction saved ~{saved_tokens:,} of ~{original_tokens:,} estimated tokens ({saved_percent:.1f}%)")
+    return compacted
+
+# Extract an uploaded document, compacting it when enabled. Returns the text to
+# analyze and the original extraction.
+def extract_document_text(uploaded_file, compact):
+    pages = extract_pages_from_file(uploaded_file)
+    raw_text = "".join(pages) if pages else None
+    if raw_text and compact:
+        return compact_document_text(pages), raw_text
+    return raw_text, raw_text
+
+# Read a setting from Streamlit secrets or the environment. Empty strings and
+# zero are valid values, so only a missing setting falls back to the default.
+def get_setting(name, default):
+    value = st.secrets.get(name)
+    if value is None:
+        value = os.environ.get(name)
+    return default if value is None else value
+
+# Read a numeric setting, falling back to the default on a malformed value
+def get_number_setting(name, default, cast=int):
+    try:
+        return cast(get_setting(name, default))
+    except (TypeError, ValueError):
+        return default
+
+# Shared response cache and cache warming state (one per server process)
+ACCESS_COUNTS_FILE = ".legalassist_access_counts.json"
+ACCESS_COUNTS_LIMIT = 500
+ACCESS_COUNTS_SAVE_SECONDS = 60
+RESPONSE_CACHE_LIMIT = 200
+IPC_SECTION_RANGE = (1, 511)
+# "302", "498A", "498-A", "IPC 376AB", "Section 302" or "Sec. 302"
+IPC_SECTION_INPUT = re.compile(r"(?:IPC\s*)?(?:(?:Section|Sec\.?)\s*)?(\d+)(?:-?([A-Z]{1,2}))?", re.IGNORECASE)
+
+def load_access_counts():
+    try:
+        with open(ACCESS_COUNTS_FILE) as f:
+            access_counts = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return access_counts if isinstance(access_counts, dict) else {}
+
+def save_access_counts(warm_cache):
+    with warm_cache["lock"]:
+        if not warm_cache["access_counts_dirty"]:
+            return
+        warm_cache["access_counts_dirty"] = False
+        access_counts = dict(warm_cache["access_counts"])
+    try:
+        with open(ACCESS_COUNTS_FILE, "w") as f:
+            json.dump(access_counts, f)
+    except OSError:
+        pass
+
+@st.cache_resource
+def get_warm_cache():
+    hot_sections = str(get_setting("WARM_CACHE_IPC_SECTIONS", "302,420,498A,376"))
+    # Statutes are given as "Act name|Year|Section(s)", separated by semicolons
+    hot_statutes = str(get_setting("WARM_CACHE_STATUTES", "Indian Penal Code|1860|;Indian Penal Code||"))
+    return {
+        "lock": threading.Lock(),
+        "responses": {},
+        "access_counts": {key: hits for key, hits in load_access_counts().items()
+                          if is_valid_cache_key(key) and isinstance(hits, int)},
+        "access_counts_dirty": False,
+        "queue": queue.PriorityQueue(),
+        "queued": set(),
+        "sequence": 0,
+        "interactive_inflight": 0,
+        "usage": {"date": datetime.now().date().isoformat(), "calls": 0, "warm_calls": 0},
+        "worker": None,
+        "settings": {
+            "hot_keys": [key for key in [ipc_cache_key(s) for s in hot_sections.split(",")]
+                         + [statute_cache_key(*s.split("|")) for s in hot_statutes.split(";") if s.count("|") == 2]
+                         if key],
+            "learned_count": get_number_setting("WARM_CACHE_LEARNED_COUNT", 10),
+            "learned_min_hits": get_number_setting("WARM_CACHE_LEARNED_MIN_HITS", 3),
+            "ttl_seconds": get_number_setting("WARM_CACHE_TTL_HOURS", 24.0, float) * 3600,
+            "daily_quota": get_number_setting("GEMINI_DAILY_QUOTA", 1500),
+            "warm_daily_budget": get_number_setting("WARM_CACHE_DAILY_BUDGET", 50),
+            "warm_interval_seconds": get_number_setting("WARM_CACHE_INTERVAL_SECONDS", 5.0, float),
+            "refresh_seconds": get_number_setting("WARM_CACHE_REFRESH_SECONDS", 3600.0, float),
+        },
+    }
+
+# Normalize a section number such as "Section 302" or "498-A" to "302" or
+# "498A". Anything else (sub-clauses, several sections, other codes) is not a
+# single IPC section and returns None.
+def parse_ipc_section(text):
+    match = IPC_SECTION_INPUT.fullmatch(text.strip())
+    if not match:
+        return None
+    return match.group(1) + (match.group(2) or "").upper()
+
+# Cache keys are only built for valid, normalized inputs so that typos and
+# junk are neither counted nor warmed
+def ipc_cache_key(section_number):
+    section = parse_ipc_section(section_number)
+    if not section or not IPC_SECTION_RANGE[0] <= int(re.match(r"\d+", section).group()) <= IPC_SECTION_RANGE[1]:
+        return None
+    return f"ipc:{section}"
+
+def statute_cache_key(act_name, year, section):
+    act_name, year, section = (" ".join(value.split()) for value in (act_name, year, section))
+    if not re.search(r"[A-Za-z]", act_name) or len(act_name) > 100 or len(section) > 50 or "|" in act_name + section:
+        return None
+    if year and not re.fullmatch(r"\d{4}", year):
+        return None
+    return f"statute:{act_name}|{year}|{section}"
+
+def is_valid_cache_key(cache_key):
+    kind, _, value = cache_key.partition(":")
+    if kind == "ipc":
+        return re.fullmatch(r"\d+[A-Z]{0,2}", value) is not None and ipc_cache_key(value) == cache_key
+    elif kind == "statute" and value.count("|") == 2:
+        return statute_cache_key(*value.split("|")) == cache_key
+    return False
+
+# Prompts that can be precomputed by the cache warmer
+def build_ipc_section_prompt(section_number):
+    return f"""
+    Provide comprehensive information about Indian Penal Code Section {section_number}, including:
+
+    1. Full text of the section
+    2. Elements of the offense/provision
+    3. Punishment/consequences
+    4. Important case law interpreting this section (3-5 landmark cases)
+    5. Related sections or provisions
+
+    If this is not a valid IPC section, please indicate that and suggest the closest relevant sections.
+    """
+
+def build_statute_citation_prompt(act_name, year, section):
+    return f"""
+    Generate a properly formatted legal citation for this Indian statute:
+    - Act name: {act_name}
+    - Year: {year}
+    - Section(s): {section}
+
+    Provide the citation in:
+    1. Bluebook format
+    2. Indian citation style
+    3. Short form for subsequent citations
+
+    Ensure proper formatting, including italics where required (shown between * symbols).
+    """
+
+def build_prompt_for_cache_key(cache_key):
+    kind, _, value = cache_key.partition(":")
+    if kind == "ipc":
+        return build_ipc_section_prompt(value)
+    elif kind == "statute":
+        act_name, year, section = value.rsplit("|", 2)
+        return build_statute_citation_prompt(act_name, year, section)
+    return None
+
+def get_cached_response(warm_cache, cache_key):
+    with warm_cache["lock"]:
+        responses = warm_cache["responses"]
+        entry = responses.pop(cache_key, None)
+        if entry and time.time() - entry[0] < warm_cache["settings"]["ttl_seconds"]:
+            # Move to the end so the least recently used entries are evicted first
+            responses[cache_key] = entry
+            return entry[1]
+    return None
+
+def store_response(warm_cache, cache_key, text):
+    now = time.time()
+    ttl_seconds = warm_cache["settings"]["ttl_seconds"]
+    with warm_cache["lock"]:
+        responses = warm_cache["responses"]
+        responses.pop(cache_key, None)
+        for key in [key for key, (stored_at, _) in responses.items() if now - stored_at >= ttl_seconds]:
+            del responses[key]
+        while len(responses) >= RESPONSE_CACHE_LIMIT:
+            del responses[next(iter(responses))]
+        responses[cache_key] = (now, text)
+
+# Access counts are saved periodically by the cache warming worker
+def record_access(warm_cache, cache_key):
+    with warm_cache["lock"]:
+        counts = warm_cache["access_counts"]
+        counts[cache_key] = counts.get(cache_key, 0) + 1
+        if len(counts) > ACCESS_COUNTS_LIMIT:
+            least_used = min(counts, key=counts.get)
+            if least_used != cache_key:
+                del counts[least_used]
+        warm_cache["access_counts_dirty"] = True
+
+# Count a Gemini call against today's quota. Interactive calls are never
+# refused; warming calls only run while both the warming budget and the
+# overall daily quota have room left.
+def reserve_gemini_call(warm_cache, warm=False):
+    settings = warm_cache["settings"]
+    with warm_cache["lock"]:
+        usage = warm_cache["usage"]
+        today = datetime.now().date().isoformat()
+        if usage["date"] != today:
+            usage.update({"date": today, "calls": 0, "warm_calls": 0})
+        if warm:
+            if usage["warm_calls"] >= settings["warm_daily_budget"] or usage["calls"] >= settings["daily_quota"]:
+                return False
+            usage["warm_calls"] += 1
+        usage["calls"] += 1
+        return True
+
+# Queue a cache key for background warming; lower priority values run first
+def enqueue_warm_job(warm_cache, cache_key, priority):
+    with warm_cache["lock"]:
+        if cache_key in warm_cache["queued"]:
+            return
+        warm_cache["queued"].add(cache_key)
+        warm_cache["sequence"] += 1
+        warm_cache["queue"].put((priority, warm_cache["sequence"], cache_key))
+
+def enqueue_hot_list(warm_cache):
+    settings = warm_cache["settings"]
+    for cache_key in settings["hot_keys"]:
+        enqueue_warm_job(warm_cache, cache_key, 1)
+    with warm_cache["lock"]:
+        learned = sorted(warm_cache["access_counts"].items(), key=lambda item: item[1], reverse=True)
+    learned = [key for key, hits in learned if hits >= settings["learned_min_hits"]]
+    for cache_key in learned[:settings["learned_count"]]:
+        enqueue_warm_job(warm_cache, cache_key, 2)
+
+# Speculatively warm the sections either side of the one being viewed
+def prefetch_neighbouring_sections(warm_cache, section):
+    if warm_cache["worker"] is None:
+        return
+    number = int(re.match(r"\d+", section).group())
+    for neighbour in (number - 1, number + 1):
+        cache_key = ipc_cache_key(str(neighbour))
+        if cache_key:
+            enqueue_warm_job(warm_cache, cache_key, 0)
+
+def cache_warm_worker(model, warm_cache):
+    settings = warm_cache["settings"]
+    last_refresh = time.time()
+    while True:
+        save_access_counts(warm_cache)
+        if time.time() - last_refresh >= settings["refresh_seconds"]:
+            enqueue_hot_list(warm_cache)
+            last_refresh = time.time()
+        try:
+            _, _, cache_key = warm_cache["queue"].get(timeout=ACCESS_COUNTS_SAVE_SECONDS)
+        except queue.Empty:
+            continue
+
+        # Interactive traffic always goes first
+        while warm_cache["interactive_inflight"] > 0:
+            time.sleep(0.5)
+
+        with warm_cache["lock"]:
+            warm_cache["queued"].discard(cache_key)
+        prompt = build_prompt_for_cache_key(cache_key)
+        if not prompt or get_cached_response(warm_cache, cache_key) is not None:
+            continue
+        if not reserve_gemini_call(warm_cache, warm=True):
+            continue
+
+        try:
+            response = model.generate_content(prompt)
+            store_response(warm_cache, cache_key, response.text)
+        except Exception:
+            pass
+        time.sleep(settings["warm_interval_seconds"])
+
+# Warming runs on the server's own API key only, never on a key a visitor
+# entered in the sidebar, and is switched off by a zero warming budget
+def start_cache_warmer(model):
+    warm_cache = get_warm_cache()
+    if not configured_api_key() or warm_cache["settings"]["warm_daily_budget"] <= 0:
+        return
+    with warm_cache["lock"]:
+        if warm_cache["worker"] is not None:
+            return
+        warm_cache["worker"] = threading.Thread(target=cache_warm_worker, args=(model, warm_cache), daemon=True)
+    enqueue_hot_list(warm_cache)
+    warm_cache["worker"].start()
+
 # Function to generate response from Gemini
-def generate_response(model, prompt, input_text=None):
+def generate_response(model, prompt, input_text=None, cache_key=None):
+    warm_cache = get_warm_cache()
+    if cache_key:
+        record_access(warm_cache, cache_key)
+        cached = get_cached_response(warm_cache, cache_key)
+        if cached is not None:
+            return cached
+
+    with warm_cache["lock"]:
+        warm_cache["interactive_inflight"] += 1
+    reserve_gemini_call(warm_cache)
     try:
         if input_text:
             response = model.generate_content([prompt, input_text])
         else:
             response = model.generate_content(prompt)
+        if cache_key:
+            store_response(warm_cache, cache_key, response.text)
         return response.text
     except Exception as e:
         st.error(f"Error generating response: {str(e)}")
         return None
+    finally:
+        with warm_cache["lock"]:
+            warm_cache["interactive_inflight"] -= 1
+
+# Run a document prompt, optionally also on the uncompacted text for comparison
+def generate_document_response(model, prompt, text, raw_text, compare):
+    response = generate_response(model, prompt, text)
+    raw_response = None
+    if compare and raw_text and raw_text != text:
+        raw_response = generate_response(model, prompt, raw_text)
+    return response, raw_response
+
+def show_document_response(title, response, raw_response=None):
+    st.subheader(title)
+    if raw_response:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("With text compaction")
+            st.markdown(response)
+        with col2:
+            st.caption("Without text compaction")
+            st.markdown(raw_response)
+    else:
+        st.markdown(response)
 
 # Define custom CSS
 def local_css():
@@ -115,6 +542,7 @@ def main():
     if not model:
         st.warning("Please enter a valid API key to continue")
         return
+    start_cache_warmer(model)
     
     # Main navigation
     app_mode = st.sidebar.selectbox(
@@ -134,6 +562,17 @@ def main():
     for item in st.session_state.history[-5:]:
         st.sidebar.markdown(f"**{item['service']}** - {item['timestamp']}")
     
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Document Settings")
+    compact_enabled = st.sidebar.checkbox(
+        "Compact extracted text", value=True,
+        help="Remove repeated headers, footers, page numbers and stamps, re-join hyphenated words and collapse whitespace before analysis"
+    )
+    compare_compaction = compact_enabled and st.sidebar.checkbox(
+        "Compare with uncompacted text",
+        help="Also run each analysis on the original extracted text and show both results side by side"
+    )
+    
     st.sidebar.markdown("---")
     st.sidebar.info("This application uses Google's Gemini API to provide AI-powered legal assistance. It is intended as a tool to assist legal professionals and should not replace professional legal advice.")
     
@@ -193,7 +632,7 @@ def main():
         
         if uploaded_file and analysis_type and st.button("Analyze Document"):
             with st.spinner("Extracting and analyzing document..."):
-                text = extract_text_from_file(uploaded_file)
+                text, raw_text = extract_document_text(uploaded_file, compact_enabled)
                 
                 if text:
                     st.subheader("Document Text (Preview)")
@@ -232,13 +671,14 @@ def main():
                             4. Compliance recommendations
                             """
                         
-                        analysis_response = generate_response(model, prompt, text)
+                        analysis_response, raw_response = generate_document_response(
+                            model, prompt, text, raw_text, compare_compaction
+                        )
                         if analysis_response:
-                            analysis_results[analysis] = analysis_response
+                            analysis_results[analysis] = (analysis_response, raw_response)
                     
-                    for analysis, result in analysis_results.items():
-                        st.subheader(analysis)
-                        st.markdown(result)
+                    for analysis, (result, raw_result) in analysis_results.items():
+                        show_document_response(analysis, result, raw_result)
                     
                     # Add to history
                     st.session_state.history.append({
@@ -255,6 +695,7 @@ def main():
         case_input_method = st.radio("Input method", ["Enter Case Citation", "Upload Case Document", "Paste Case Text"])
         
         case_text = ""
+        raw_case_text = ""
         if case_input_method == "Enter Case Citation":
             citation = st.text_input("Enter case citation (e.g., AIR 2019 SC 1234)")
             if citation and st.button("Fetch and Summarize"):
@@ -265,7 +706,7 @@ def main():
             case_file = st.file_uploader("Upload case document", type=["pdf", "docx", "txt"])
             if case_file and st.button("Extract and Summarize"):
                 with st.spinner("Extracting text..."):
-                    case_text = extract_text_from_file(case_file)
+                    case_text, raw_case_text = extract_document_text(case_file, compact_enabled)
                     if case_text:
                         st.text_area("Extracted case text (preview):", case_text[:500] + "...", height=100)
         
@@ -287,10 +728,11 @@ def main():
                 Structure your response in a clear, organized format suitable for legal professionals.
                 """
                 
-                response = generate_response(model, prompt, case_text)
+                response, raw_response = generate_document_response(
+                    model, prompt, case_text, raw_case_text, compare_compaction
+                )
                 if response:
-                    st.subheader("Case Summary")
-                    st.markdown(response)
+                    show_document_response("Case Summary", response, raw_response)
                     
                     # Add to history
                     st.session_state.history.append({
@@ -446,21 +888,8 @@ def main():
             if st.button("Generate Citation"):
                 if act_name:
                     with st.spinner("Generating citation..."):
-                        prompt = f"""
-                        Generate a properly formatted legal citation for this Indian statute:
-                        - Act name: {act_name}
-                        - Year: {year}
-                        - Section(s): {section}
-                        
-                        Provide the citation in:
-                        1. Bluebook format
-                        2. Indian citation style
-                        3. Short form for subsequent citations
-                        
-                        Ensure proper formatting, including italics where required (shown between * symbols).
-                        """
-                        
-                        response = generate_response(model, prompt)
+                        prompt = build_statute_citation_prompt(act_name, year, section)
+                        response = generate_response(model, prompt, cache_key=statute_cache_key(act_name, year, section))
                         if response:
                             st.subheader("Generated Citation")
                             st.markdown(response)
@@ -484,11 +913,12 @@ def main():
         judgment_input_method = st.radio("Input method", ["Upload Judgment", "Paste Judgment Text"])
         
         judgment_text = ""
+        raw_judgment_text = ""
         if judgment_input_method == "Upload Judgment":
             judgment_file = st.file_uploader("Upload judgment document", type=["pdf", "docx", "txt"])
             if judgment_file and st.button("Extract Text"):
                 with st.spinner("Extracting text..."):
-                    judgment_text = extract_text_from_file(judgment_file)
+                    judgment_text, raw_judgment_text = extract_document_text(judgment_file, compact_enabled)
                     if judgment_text:
                         st.text_area("Extracted judgment text (preview):", judgment_text[:500] + "...", height=100)
         
@@ -514,10 +944,11 @@ def main():
                 Approach this analysis academically and objectively. Consider both explicit and implicit bias markers.
                 """
                 
-                response = generate_response(model, prompt, judgment_text)
+                response, raw_response = generate_document_response(
+                    model, prompt, judgment_text, raw_judgment_text, compare_compaction
+                )
                 if response:
-                    st.subheader("Bias Analysis Results")
-                    st.markdown(response)
+                    show_document_response("Bias Analysis Results", response, raw_response)
                     
                     # Add to history
                     st.session_state.history.append({
@@ -537,21 +968,17 @@ def main():
             
             if section_number and st.button("Search Section"):
                 with st.spinner("Retrieving section information..."):
-                    prompt = f"""
-                    Provide comprehensive information about Indian Penal Code Section {section_number}, including:
-                    
-                    1. Full text of the section
-                    2. Elements of the offense/provision
-                    3. Punishment/consequences
-                    4. Important case law interpreting this section (3-5 landmark cases)
-                    5. Related sections or provisions
-                    
-                    If this is not a valid IPC section, please indicate that and suggest the closest relevant sections.
-                    """
-                    
-                    response = generate_response(model, prompt)
+                    cache_key = ipc_cache_key(section_number)
+                    if cache_key:
+                        section = parse_ipc_section(section_number)
+                        prompt = build_ipc_section_prompt(section)
+                        response = generate_response(model, prompt, cache_key=cache_key)
+                        prefetch_neighbouring_sections(get_warm_cache(), section)
+                    else:
+                        prompt = build_ipc_section_prompt(section_number)
+                        response = generate_response(model, prompt)
                     if response:
-                        st.subheader(f"IPC Section {section_number}")
+                        st.subheader(f"IPC Section {parse_ipc_section(section_number) or section_number}")
                         st.markdown(response)
                         
                         # Add to history